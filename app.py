@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 from datetime import datetime, timedelta
+from pathlib import Path
 import numpy as np
 
+# Seeded so the generated sample data is identical across process restarts
+_RNG = np.random.default_rng(42)
+
 # --- Page Config ---
+# Kept outside any cache: the page config message is not replayed on cache hits,
+# so it has to be sent on every run for each session to get the wide layout
 st.set_page_config(
     page_title="Water Usage Dashboard",
     layout="wide",
@@ -12,55 +17,12 @@ st.set_page_config(
 )
 
 # --- Custom CSS for Theme, Icons, and Hiding GitHub Icon ---
-st.markdown("""
-    <style>
-        /* Navy Blue Theme */
-        .main, .css-18e3th9, .css-1d391kg {
-            background-color: #f7f9fc !important;
-        }
-        h1, h2, h3, h4, h5, h6 {
-            color: #002B5B;
-        }
-        .st-bb, .st-cg, .st-df, .st-e3 {
-            color: #002B5B;
-        }
-
-        /* Hide GitHub Icon */
-        #GithubIcon {
-            visibility: hidden;
-        }
-
-        /* Floating Chatbot Icon */
-        #chatbot-button {
-            position: fixed;
-            bottom: 30px;
-            right: 30px;
-            background-color: #002B5B;
-            color: white;
-            border-radius: 50%;
-            width: 60px;
-            height: 60px;
-            text-align: center;
-            font-size: 30px;
-            line-height: 60px;
-            box-shadow: 2px 2px 10px rgba(0,0,0,0.2);
-            z-index: 100;
-        }
-
-        /* Top Bar Icons */
-        #top-icons {
-            position: fixed;
-            top: 15px;
-            right: 25px;
-            z-index: 100;
-        }
-        #top-icons i {
-            font-size: 24px;
-            color: #002B5B;
-            margin-left: 15px;
-            cursor: pointer;
-        }
-    </style>
+@st.cache_resource
+def _ui_chrome():
+    with open(Path(__file__).parent / "static" / "theme.css") as f:
+        css = f.read()
+    return f"""
+    <style>{css}</style>
 
     <div id="chatbot-button">💬</div>
 
@@ -70,28 +32,113 @@ st.markdown("""
     </div>
 
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css">
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_ui_chrome(), unsafe_allow_html=True)
+
+# --- Shared Chart Layout ---
+# Plotly itself is imported inside the builders, only once there is data to chart
+CHART_LAYOUT = dict(
+    template='plotly_white',
+    font=dict(size=14),
+    margin=dict(l=30, r=30, t=50, b=30),
+    title_font=dict(color="#002B5B"),
+    # Fixed size so window and sidebar resizes don't trigger a Plotly relayout
+    autosize=False,
+    width=900,
+    height=400
+)
+CHART_CONFIG = {'responsive': False, 'staticPlot': False}
+
+# --- Chart Builders ---
+@st.cache_data
+def build_line_fig(filtered_labels, filtered_categories, filtered_usage):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for i, cat in enumerate(filtered_categories):
+        fig.add_trace(go.Scattergl(
+            x=filtered_labels,
+            y=filtered_usage[:, i],
+            name=cat,
+            mode='lines+markers'
+        ))
+    fig.update_layout(
+        **CHART_LAYOUT,
+        title='Daily Water Usage by Category',
+        xaxis_title="Date",
+        xaxis_type="category",
+        yaxis_title="Litres Used",
+        legend_title="Category",
+        hovermode="x unified"
+    )
+    return fig
+
+@st.cache_data
+def build_pie_fig(category_usage):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Pie(
+        labels=category_usage.index.to_numpy(),
+        values=category_usage.values,
+        hole=0.45,
+        textinfo='percent+label',
+        pull=[0.05] * len(category_usage)
+    ))
+    fig.update_layout(
+        **CHART_LAYOUT,
+        title='Water Usage Breakdown by Category'
+    )
+    return fig
+
+@st.cache_data
+def build_bar_fig(category_usage):
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    colors = pio.templates['plotly_white'].layout.colorway
+    fig = go.Figure(go.Bar(
+        x=category_usage.index.to_numpy(),
+        y=category_usage.values,
+        text=category_usage.values,
+        marker_color=colors[:len(category_usage)]
+    ))
+    fig.update_layout(
+        **CHART_LAYOUT,
+        title='Total Water Usage by Category',
+        xaxis_title="Category",
+        yaxis_title="Water Usage (Litres)",
+        showlegend=False
+    )
+    return fig
+
+def build_all_figs(filtered_labels, filtered_categories, filtered_usage, category_usage):
+    return {
+        'line': build_line_fig(filtered_labels, filtered_categories, filtered_usage),
+        'pie': build_pie_fig(category_usage),
+        'bar': build_bar_fig(category_usage)
+    }
 
 # --- Generate Sample Data ---
 @st.cache_data
 def generate_data():
     dates = pd.date_range(start=datetime.today() - timedelta(days=30), periods=31)
-    categories = ['Boys', 'Girls', 'Staff']
-    data = []
-    for date in dates:
-        for cat in categories:
-            usage = np.random.randint(50, 200)
-            data.append({'Date': date, 'Category': cat, 'Water Usage (Litres)': usage})
-    return pd.DataFrame(data)
+    categories = np.array(['Boys', 'Girls', 'Staff'])
+    # Usage is stored as a (date x category) matrix so every KPI and chart is an axis reduction.
+    # Readings are 50-200 litres, so int16 is enough; sums accumulate in int64.
+    usage = _RNG.integers(50, 200, size=(len(dates), len(categories)), dtype=np.int16)
+    # Format the date labels once here rather than per rerun or per hover tooltip
+    date_labels = dates.strftime('%Y-%m-%d').to_numpy()
+    return dates.values.astype('datetime64[D]'), date_labels, categories, usage
 
-df = generate_data()
+dates, date_labels, categories, usage_matrix = generate_data()
 
 # --- Title ---
 st.title("💧 AquaVisionX - Water Usage Dashboard")
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
-date_range = st.sidebar.date_input("Select Date Range", [df['Date'].min(), df['Date'].max()])
+date_range = st.sidebar.date_input("Select Date Range", [pd.Timestamp(dates[0]), pd.Timestamp(dates[-1])])
 
 if len(date_range) != 2:
     st.error("Please select a valid date range.")
@@ -99,7 +146,7 @@ if len(date_range) != 2:
 
 start_date, end_date = date_range
 
-all_categories = df['Category'].unique().tolist()
+all_categories = categories.tolist()
 selected_categories = st.sidebar.multiselect(
     "Select Categories", options=all_categories, default=all_categories
 )
@@ -109,104 +156,76 @@ if not selected_categories:
     selected_categories = ["Boys"]
 
 # --- Filter Data ---
-filtered_df = df[
-    (df['Date'] >= pd.to_datetime(start_date)) &
-    (df['Date'] <= pd.to_datetime(end_date)) &
-    (df['Category'].isin(selected_categories))
-]
+@st.cache_data
+def get_filtered(start_date, end_date, cats: tuple):
+    day_mask = (dates >= np.datetime64(start_date, 'D')) & (dates <= np.datetime64(end_date, 'D'))
+    # One flag per category column; no per-row category lookup is needed
+    selected = set(cats)
+    cat_mask = np.array([c in selected for c in categories], dtype=bool)
+    return date_labels[day_mask], categories[cat_mask], usage_matrix[day_mask][:, cat_mask]
+
+filter_key = (start_date, end_date, tuple(sorted(selected_categories)))
+filtered_labels, filtered_categories, filtered_usage = get_filtered(*filter_key)
+has_data = filtered_usage.size > 0
+
+# --- Category Totals and Figures ---
+# Reuse the previous run's aggregation and figures while the filter is unchanged
+if st.session_state.get('last_filter') != filter_key:
+    category_usage = pd.Series(
+        filtered_usage.sum(axis=0, dtype=np.int64),
+        index=pd.Index(filtered_categories, name='Category'),
+        name='Water Usage (Litres)'
+    )
+    figs = {}
+    if has_data:
+        figs = build_all_figs(filtered_labels, filtered_categories, filtered_usage, category_usage)
+    st.session_state.figs = figs
+    st.session_state.category_usage = category_usage
+    st.session_state.last_filter = filter_key
+
+category_usage = st.session_state.category_usage
+figs = st.session_state.figs
 
 # --- KPI Metrics ---
 st.markdown("### 🔢 Key Metrics")
-if filtered_df.empty:
+if not has_data:
     st.info("No data available for the selected filters.")
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Water Used", "0 Litres")
     col2.metric("Average Daily Usage", "0 Litres")
     col3.metric("Peak Usage Day", "N/A")
 else:
-    total_usage = filtered_df['Water Usage (Litres)'].sum()
-    avg_daily = filtered_df.groupby('Date')['Water Usage (Litres)'].sum().mean()
-    peak_day = filtered_df.groupby('Date')['Water Usage (Litres)'].sum().idxmax()
+    daily = filtered_usage.sum(axis=1, dtype=np.int64)
+    total_usage = daily.sum()
+    avg_daily = daily.mean()
+    peak_day = filtered_labels[daily.argmax()]
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Water Used", f"{total_usage:.0f} Litres")
     col2.metric("Average Daily Usage", f"{avg_daily:.0f} Litres")
-    col3.metric("Peak Usage Day", peak_day.strftime('%Y-%m-%d'))
+    col3.metric("Peak Usage Day", peak_day)
 
 # --- Line Chart ---
 st.markdown("### 📈 Water Usage Over Time")
-if not filtered_df.empty:
-    fig1 = px.line(
-        filtered_df,
-        x='Date',
-        y='Water Usage (Litres)',
-        color='Category',
-        markers=True,
-        template='plotly_white',
-        title='Daily Water Usage by Category'
-    )
-    fig1.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Litres Used",
-        legend_title="Category",
-        hovermode="x unified",
-        font=dict(size=14),
-        margin=dict(l=30, r=30, t=50, b=30),
-        title_font=dict(color="#002B5B")
-    )
-    st.plotly_chart(fig1, use_container_width=True)
+if has_data:
+    st.plotly_chart(figs['line'], key='line', use_container_width=False, config=CHART_CONFIG)
 else:
     st.write("No data to display.")
 
 # --- Pie Chart ---
 st.markdown("### 🥧 Usage Distribution by Category")
-if not filtered_df.empty:
-    category_usage = filtered_df.groupby('Category')['Water Usage (Litres)'].sum().reset_index()
-    
-    pie_chart = px.pie(
-        category_usage,
-        names='Category',
-        values='Water Usage (Litres)',
-        hole=0.45,
-        template='plotly_white',
-        title='Water Usage Breakdown by Category'
-    )
-    pie_chart.update_traces(
-        textinfo='percent+label',
-        pull=[0.05] * len(category_usage)
-    )
-    pie_chart.update_layout(
-        font=dict(size=14),
-        margin=dict(l=30, r=30, t=50, b=30),
-        title_font=dict(color="#002B5B")
-    )
-    st.plotly_chart(pie_chart, use_container_width=True)
+if has_data:
+    st.plotly_chart(figs['pie'], key='pie', use_container_width=False, config=CHART_CONFIG)
 
     # --- Bar Chart ---
-    bar_chart = px.bar(
-        category_usage,
-        x='Category',
-        y='Water Usage (Litres)',
-        color='Category',
-        text_auto=True,
-        template='plotly_white',
-        title='Total Water Usage by Category'
-    )
-    bar_chart.update_layout(
-        font=dict(size=14),
-        margin=dict(l=30, r=30, t=50, b=30),
-        title_font=dict(color="#002B5B"),
-        showlegend=False
-    )
-    st.plotly_chart(bar_chart, use_container_width=True)
+    st.plotly_chart(figs['bar'], key='bar', use_container_width=False, config=CHART_CONFIG)
 else:
     st.write("No category usage data.")
 
 # --- Leaderboard ---
 st.markdown("### 🏆 Leaderboard (Gamification Idea)")
-if not filtered_df.empty:
-    leaderboard = filtered_df.groupby('Category')['Water Usage (Litres)'].sum().reset_index()
-    leaderboard = leaderboard.sort_values(by='Water Usage (Litres)', ascending=True)
-    st.dataframe(leaderboard.reset_index(drop=True), use_container_width=True)
+if has_data:
+    leaderboard = category_usage.sort_values(ascending=True).reset_index()
+    st.table(leaderboard)
 else:
     st.write("Leaderboard unavailable due to lack of data.")
\ No newline at end of file